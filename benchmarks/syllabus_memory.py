@@ -0,0 +1,247 @@
+"""
+====> LMS Migrator: syllabus memory benchmark <====
+
+This script measures how much memory the syllabus metadata takes up, per
+syllabus row, for both the original dict-of-dicts representation and the
+current ActivityMeta representation returned by extract_metadata().
+
+It generates a syllabus workbook with the requested number of rows (100,000
+by default), loads it each way, and prints the median over several runs of:
+    - the memory still held by the returned metadata, per row
+    - the peak memory used while loading the syllabus
+
+Each run loads the syllabus in a fresh Python process, after a small
+warm-up load, so that one representation's measurements are not skewed by
+caches & interned strings left behind by the other, or by one-time imports.
+
+Usage (from the repository's root directory):
+    python3 benchmarks/syllabus_memory.py [--rows ROWS] [--runs RUNS]
+"""
+
+import argparse                  # Reads command line options.
+import datetime                  # Builds the syllabus dates & times.
+import gc                        # Clears reference cycles before sampling.
+import os                        # Builds file paths.
+import statistics                # Takes the median of several runs.
+import subprocess                # Runs each measurement in a fresh process.
+import sys                       # Makes lms_migrator importable.
+import tempfile                  # Holds the generated syllabus.
+import tracemalloc               # Measures memory allocations.
+
+import openpyxl as opxl          # Writes & reads the Excel-formatted syllabus.
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+import lms_migrator
+
+
+
+def build_syllabus(filepath_syl, rows, title_prefix = "Activity",
+                   term_start = datetime.date(2026, 9, 1)):
+    """
+    This function writes a syllabus workbook in the new_syllabus.xlsx format
+    to the given path, with the given number of activity rows. Every title is
+    unique, and the dates cycle through a 120-day term. Optionally, it also
+    accepts the text that starts each title and the first day of the term.
+    It returns nothing.
+    """
+
+    syllabus_wb = opxl.Workbook(write_only = True)
+    syllabus_ws = syllabus_wb.create_sheet("syllabus")
+    syllabus_ws.append(["Previous Semester Activity Title",
+                        "New Semester Activity Title",
+                        "Available Date", "Available Time",
+                        "Due Date", "Due Time",
+                        "Lock Date", "Lock Time"])
+
+    for row in range(rows):
+        avail_date = term_start + datetime.timedelta(days = row % 120)
+        syllabus_ws.append(["{} {}".format(title_prefix, row),
+                            "New {} {}".format(title_prefix.lower(), row),
+                            avail_date, datetime.time(8, 0),
+                            avail_date + datetime.timedelta(days = 7),
+                            datetime.time(23, 59),
+                            avail_date + datetime.timedelta(days = 14),
+                            datetime.time(23, 59)])
+
+    syllabus_wb.save(filepath_syl)
+
+    return
+
+
+def extract_metadata_original(filepath_syl):
+    """
+    This function reproduces the original extract_metadata() from
+    LMS Migrator 1.4.0 and earlier, for comparison. The whole workbook is
+    loaded, every row is copied to a list of tuples, and each activity is
+    stored as a dictionary of its new title and datetime objects.
+    It returns the original course metadata dictionary.
+    """
+
+    syllabus_wb = opxl.load_workbook(filepath_syl)
+    syllabus_ws = syllabus_wb["syllabus"]
+    syllabus_data = list(syllabus_ws.values)
+
+    extracted_meta = {}
+    for activity_number in range(1, len(syllabus_data)):
+        activity_meta = syllabus_data[activity_number]
+        old_title = activity_meta[0]
+
+        if activity_meta[2]:
+            try:
+                new_avail_datetime = datetime.datetime.combine(
+                    activity_meta[2], activity_meta[3])
+            except TypeError:
+                new_avail_datetime = datetime.datetime.combine(
+                    activity_meta[2], activity_meta[3].time())
+        else:
+            new_avail_datetime = None
+
+        if activity_meta[4]:
+            new_due_datetime = datetime.datetime.combine(activity_meta[4],
+                                                         activity_meta[5])
+        else:
+            new_due_datetime = None
+
+        if activity_meta[6]:
+            new_lock_datetime = datetime.datetime.combine(activity_meta[6],
+                                                          activity_meta[7])
+        else:
+            new_lock_datetime = None
+
+        extracted_meta[old_title] = {"new_title" : activity_meta[1],
+                                     "new_avail_datetime" : new_avail_datetime,
+                                     "new_due_datetime" : new_due_datetime,
+                                     "new_lock_datetime" : new_lock_datetime}
+
+    return extracted_meta
+
+
+def extract_metadata_current(filepath_syl):
+    """
+    This function loads the syllabus with the current extract_metadata().
+    It returns the course metadata dictionary of ActivityMeta records.
+    """
+
+    lms_migrator.filepath_syl = filepath_syl
+
+    return lms_migrator.extract_metadata()
+
+
+def measure(loader, filepath_syl):
+    """
+    This function loads the syllabus with the given loader function while
+    tracing memory allocations.
+    Garbage is collected before each sample, so that reference cycles left
+    behind by openpyxl are not counted as retained memory.
+    It returns the number of rows loaded, the bytes still held by the
+    returned metadata, and the peak bytes used while loading.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+
+    extracted_meta = loader(filepath_syl)
+
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(extracted_meta), retained, peak
+
+
+def measure_in_process(name, filepath_syl, filepath_warmup):
+    """
+    This function is run in a fresh Python process for each measurement.
+    It loads the small warm-up syllabus once, unmeasured, and then measures
+    loading the full syllabus with the named representation.
+    It prints the number of rows loaded, the bytes still held, and the peak
+    bytes used, separated by spaces.
+    """
+
+    # Silence lms_migrator's progress messages while measuring.
+    lms_migrator.gui_progress_update = (
+        lambda *message_args, **message_kwargs: None)
+
+    loader = LOADERS[name]
+    loader(filepath_warmup)
+
+    rows, retained, peak = measure(loader, filepath_syl)
+    print(rows, retained, peak)
+
+    return
+
+
+def main():
+    """
+    This function builds the syllabi, measures both representations several
+    times (each in a fresh process), and prints the median results.
+    """
+
+    parser = argparse.ArgumentParser(description = "Syllabus memory benchmark")
+    parser.add_argument("--rows", type = int, default = 100000,
+                        help = "number of syllabus rows (default: 100000)")
+    parser.add_argument("--runs", type = int, default = 5,
+                        help = """number of runs per representation; the
+                        median is reported (default: 5)""")
+    parser.add_argument("--measure", nargs = 3,
+                        metavar = ("NAME", "SYLLABUS", "WARMUP"),
+                        help = argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure_in_process(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath_syl = os.path.join(tmp_dir, "new_syllabus.xlsx")
+        print("Building a {}-row syllabus.".format(args.rows), flush = True)
+        build_syllabus(filepath_syl, args.rows)
+
+        # The warm-up syllabus uses different titles & dates, so that none
+        # of its strings are shared with the measured syllabus.
+        filepath_warmup = os.path.join(tmp_dir, "warmup_syllabus.xlsx")
+        build_syllabus(filepath_warmup, 100, title_prefix = "Warm-up",
+                       term_start = datetime.date(2000, 1, 1))
+
+        results = {}
+        for run in range(1, args.runs + 1):
+            # Alternate the order, so neither representation always goes
+            # first.
+            names = list(LOADERS)
+            if run % 2 == 0:
+                names.reverse()
+
+            for name in names:
+                print("Run {} of {}: loading with the {} representation."
+                      .format(run, args.runs, name), flush = True)
+                measurement = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--measure",
+                     name, filepath_syl, filepath_warmup],
+                    check = True, stdout = subprocess.PIPE, text = True)
+                rows, retained, peak = [int(value) for value in
+                                        measurement.stdout.split()[-3:]]
+                results.setdefault(name, []).append((rows, retained, peak))
+
+    print()
+    print("Median of {} runs, each in a fresh process:".format(args.runs))
+    print("{:<10} {:>8} {:>16} {:>16}".format("", "rows",
+                                             "retained B/row", "peak MiB"))
+    for name in LOADERS:
+        rows = results[name][0][0]
+        retained = statistics.median(run[1] for run in results[name])
+        peak = statistics.median(run[2] for run in results[name])
+        print("{:<10} {:>8} {:>16.0f} {:>16.1f}".format(
+            name, rows, retained / rows, peak / 2**20))
+
+    return
+
+
+# The representations to compare, by name.
+LOADERS = {"original" : extract_metadata_original,
+           "current" : extract_metadata_current}
+
+
+
+if __name__ == "__main__":
+    main()
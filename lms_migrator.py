@@ -14,7 +14,7 @@ This script requires the following modules and their dependencies:
 """
 
 # ==== INDICATE VERSION NUMBER ==== 
-version = "1.1.4"
+version = "1.5.0"
 
 
 # ==== IMPORT THE REQUIRED MODULES ==== 
@@ -26,11 +26,46 @@ from shutil import rmtree        # For deleting files after completion.
 import os                        # Used for gathering working directory info.
 import datetime                  # Handle basic date / time manipulations.
 from zipfile import ZipFile      # Compression for .imscc archive files.
+from zipfile import ZipInfo      # Fixes archive member metadata.
+from shutil import copyfileobj   # Copies course files into the archive.
 from sys import exit             # Handles script termination
+import sys                       # Interns repeated syllabus titles.
+from collections import namedtuple  # Compact records for syllabus rows.
 import tkinter as tk             # Builds graphical interface
 from tkinter import filedialog   # Manages graphical file open/save boxes.
 from tkinter import scrolledtext as st  # Scrolling text for progress updates.
 from inspect import cleandoc     # Cleans up multi-line text for GUI display.
+import argparse                  # Reads command line options for batch runs.
+import csv                       # Reads the list of jobs for batch runs.
+import hashlib                   # Fingerprints batch inputs & outputs.
+import json                      # Formats the batch completion journal.
+import time                      # Paces polling of the syllabus in watch mode.
+
+
+
+# ==== ARCHIVE MEMBER METADATA ====
+# Every file in a new .imscc archive is stamped with the same date/time and
+# permissions, so that identical inputs always produce identical archives.
+ZIP_MEMBER_DATE_TIME = (1980, 1, 1, 0, 0, 0)   # Earliest date a zip allows.
+ZIP_MEMBER_MODE = 0o100644                     # Regular file, rw-r--r--.
+
+
+# ==== LEARNING ACTIVITY METADATA FILES ====
+# Files within an activity's subdirectory that hold its title & due dates.
+ACTIVITY_META_FILES = ["assignment_settings.xml", "assessment_meta.xml"]
+
+
+# ==== BATCH JOB COLUMNS ====
+# Column headers required in the CSV file of jobs for a batch run.
+BATCH_JOB_COLUMNS = ["prior_course", "syllabus", "new_course"]
+
+
+# ==== SYLLABUS METADATA RECORD ====
+# The new metadata for one learning activity, as read from the syllabus.
+# The available (unlock_at), due, and lock times are LMS-formatted UTC
+# strings, or empty strings where the syllabus gives no date.
+ActivityMeta = namedtuple("ActivityMeta",
+                          ["new_title", "unlock_at", "due_at", "lock_at"])
 
     
 
@@ -50,14 +85,22 @@ def compress_new_course():
     gui_progress_update(msg_compress_crs)
     
     # Make a list of relative paths to all files within new_course, including
-    # within subdirectories.
+    # within subdirectories. The walk is sorted so that the archive members
+    # are always stored in the same order, regardless of the order in which
+    # the file system happens to list them.
     files_to_bundle = []
     for root, directories, files in os.walk(filepath_root + "new_course"):
-        for filename in files:
+        directories.sort()
+        for filename in sorted(files):
             filepath = os.path.join(root, filename)
             files_to_bundle.append(filepath)
     
-    with ZipFile(filepath_new, mode = "w") as new_course_zip:
+    # Build the archive under a temporary name, then rename it into place.
+    # If the script is interrupted part of the way through, a half-written
+    # .imscc file is never left behind under the destination file name.
+    filepath_partial = filepath_new + ".part"
+    
+    with ZipFile(filepath_partial, mode = "w") as new_course_zip:
         for file in files_to_bundle:
         
             # Determine relative path to the file. Otherwise, the .imscc file
@@ -66,7 +109,20 @@ def compress_new_course():
             # the computer executing this script. That's not useful for the LMS.
             rel_path = os.path.relpath(file,
                                        start = filepath_root + "new_course")
-            new_course_zip.write(file, arcname = rel_path)
+            
+            # Give every member the same timestamp, permissions, and
+            # originating system, rather than whatever is on disk. Identical
+            # course content then always produces an identical .imscc file.
+            member_info = ZipInfo(rel_path, date_time = ZIP_MEMBER_DATE_TIME)
+            member_info.create_system = 3
+            member_info.external_attr = ZIP_MEMBER_MODE << 16
+            member_info.file_size = os.path.getsize(file)
+            
+            with open(file, mode = "rb") as member_src, \
+                 new_course_zip.open(member_info, mode = "w") as member_dst:
+                copyfileobj(member_src, member_dst)
+    
+    os.replace(filepath_partial, filepath_new)
     
     return
 
@@ -100,6 +156,8 @@ def extract_metadata():
     This function opens the user-generated syllabus file,.
     New course metadata are extracted, such as new homework/quiz titles, due
     dates, etc..
+    Each row is checked once, as it is read. Rows with unreadable dates or
+    times are reported to the user and left out.
     It returns a completed course metadata dictionary, the structure of which
     is defined in a comment below.
     """
@@ -110,76 +168,82 @@ def extract_metadata():
     msg_extract_meta = "Reading the syllabus."
     gui_progress_update(msg_extract_meta)
 
-    # Open the Excel workbook & read the worksheet named "syllabus"
-    syllabus_wb = opxl.load_workbook(filepath_syl)
-    syllabus_ws = syllabus_wb["syllabus"]
+    # Open the Excel workbook & read the worksheet named "syllabus".
+    # Read-only mode streams the rows rather than loading every cell.
+    syllabus_wb = opxl.load_workbook(filepath_syl, read_only = True)
 
-    # Note: syllabus_ws.values is a list generator, providing one tuple for
-    # each data row present. The required format is derived from the format
-    # of new_syllabus.xlsx: 
+    # Note: iter_rows(values_only = True) is a generator, providing one tuple
+    # for each data row present. The required format is derived from the
+    # format of new_syllabus.xlsx: 
     #    ('Previous Semester Activity Title', 'New Semester Activity Title',
     #     'Available Date', 'Available Time', 'Due Date', 'Due Time',
     #     'Lock Date', 'Lock Time')
-
-    # Extract all the syllabus data to a list of tuples, with one tuple for
-    # each row in the Excel syllabus.
-    syllabus_data = list(syllabus_ws.values)
         
     # Create the extracted_meta metadata dictionary, which will be populated
     # with individual learning activities. The previous semester's activity 
-    # names are the keys in this dictionary, and the values are a subdictionary
-    # of metadata for each learning activity, e.g.:
+    # names are the keys in this dictionary, and the values are an
+    # ActivityMeta record for each learning activity, e.g.:
     # extracted_meta = {prev_semester_activity_title_1 :
-    #                {"new_title" : new_title,
-    #                "new_avail_datetime" : new_avail_datetime,
-    #                "new_due_datetime" : new_due_datetime,
-    #                "new_lock_datetime" : new_lock_datetime}
+    #                ActivityMeta(new_title, unlock_at, due_at, lock_at)}
+    # The dates & times are stored as ready-to-use LMS date/time strings.
     extracted_meta = {}
+    invalid_rows = []
+    
+    try:
+        syllabus_ws = syllabus_wb["syllabus"]
         
-    # Restructure the listed activity information from syllabus_data into the 
-    # extracted_meta metadata dictionary.
-    # Ignore the first list entry, which contains only the header row
-    # information, such as "Activity Title", etc.
-
-    for activity_number in range(1, len(syllabus_data)):
-        # Read metatata out of the syllabus. This returns the raw tuple
-        # generated by openpyxl upon reading the Excel data row.
-        activity_meta = syllabus_data[activity_number]
+        # In read-only mode, openpyxl only reads the cells inside the sheet's
+        # stored dimensions, which some spreadsheet programs get wrong.
+        # Forget them, so that every row & column actually present is read.
+        syllabus_ws.reset_dimensions()
         
-        # Extract useful information from the raw tuple & restructure for the
-        # dict.
-        old_title = activity_meta[0]
+        # Restructure the activity information from each syllabus row into
+        # the extracted_meta metadata dictionary.
+        # Skip the first row, which contains only the header row
+        # information, such as "Activity Title", etc.
+        for row_number, activity_meta in enumerate(
+                syllabus_ws.iter_rows(min_row = 2, values_only = True),
+                start = 2):
         
-        if activity_meta[2]:
-            # For reasons yet to be determined, openpyxl sometimes reads the new due time (activity_meta[3]) as a datetime object; other times as a time object. datetime.datetime.combine requires that the time component is a time object, so it must be converted if it is read as a datetime object.
-            try:
-                new_avail_datetime = datetime.datetime.combine(activity_meta[2], activity_meta[3])
-            except TypeError:
-                new_avail_datetime = datetime.datetime.combine(activity_meta[2], activity_meta[3].time())
-        else:
-            new_avail_datetime = None
+            # Pad out short rows, whose trailing empty cells may be omitted.
+            activity_meta = (tuple(activity_meta)
+                             + (None,) * (8 - len(activity_meta)))
+        
+            # Skip blank rows.
+            if activity_meta[0] is None:
+                continue
         
-        if activity_meta[4]:
-            new_due_datetime = datetime.datetime.combine(activity_meta[4],
-                                                         activity_meta[5])
-        else:
-            new_due_datetime = None
+            try:
+                new_activity_meta = ActivityMeta(
+                    new_title = intern_title(activity_meta[1]),
+                    unlock_at = syllabus_datetime(activity_meta[2],
+                                                  activity_meta[3]),
+                    due_at = syllabus_datetime(activity_meta[4],
+                                               activity_meta[5]),
+                    lock_at = syllabus_datetime(activity_meta[6],
+                                                activity_meta[7]))
+            except ValueError as err:
+                invalid_rows.append("Row {}: {}".format(row_number, err))
+                continue
+
+            # Add this activity's updated information to the extracted_meta
+            # metadata dictionary.
+            extracted_meta[intern_title(activity_meta[0])] = new_activity_meta
+    
+    finally:
+        # Close the file promptly. Watch mode reads it again on every save.
+        syllabus_wb.close()
+    
+    # Print a message alerting the user to any rows that could not be read.
+    if len(invalid_rows) > 0:
+        msg_invalid_rows = """
+        Found _{}_ rows in the syllabus with unreadable dates or times.
+        These activities will not be modified:"""
+        gui_progress_update(msg_invalid_rows.format(len(invalid_rows)))
         
-        if activity_meta[6]:
-            new_lock_datetime = datetime.datetime.combine(activity_meta[6],
-                                                          activity_meta[7])
-        else:
-            new_lock_datetime = None
-
-        # Add this activity's updated information to the extracted_meta
-        # metadata dictionary.
-        extracted_meta[old_title] = {"new_title" : activity_meta[1],
-                                     "new_avail_datetime" : new_avail_datetime,
-                                     "new_due_datetime" : new_due_datetime,
-                                     "new_lock_datetime" : new_lock_datetime}
-    
-    # Print a status update.
-    # print("Done.")
+        for invalid_row in invalid_rows:
+            gui_progress_update("\t" + invalid_row, leading_lbs = 1,
+                                cleanup = False)
                                      
     return extracted_meta
 
@@ -202,6 +266,8 @@ def find_activities():
     # Make a copy of the old course files.
     # Ultimately, we'll edit the due dates and related metadata within
     # new_course. Nothing is modified in old_course.
+    # If new_course is left over from an interrupted run, empty it first.
+    rmtree(filepath_root + "new_course", ignore_errors = True)
     copytree(filepath_root + "old_course", filepath_root + "new_course")
 
     # Generate a list of copied learning activities.
@@ -239,6 +305,94 @@ def format_datetime(local_dt):
     return formatted_dt
 
 
+def intern_title(title):
+    """
+    This function accepts an activity title read from the syllabus.
+    It returns the title as an interned string, so that repeated titles
+    share a single copy in memory. Empty titles are returned as None.
+    """
+    
+    if title is None or title == "":
+        return None
+    
+    return sys.intern(str(title))
+
+
+def remove_scratch_files():
+    """
+    This function deletes the old_course and new_course working
+    directories, and any half-written new course file (.part) left behind
+    by compress_new_course().
+    It returns nothing.
+    """
+    
+    global filepath_root, filepath_new
+    
+    rmtree(filepath_root + "old_course", ignore_errors = True)
+    rmtree(filepath_root + "new_course", ignore_errors = True)
+    if os.path.exists(filepath_new + ".part"):
+        os.remove(filepath_new + ".part")
+    
+    return
+
+
+def report_undefined_activities():
+    """
+    This function prints a message alerting the user if any learning
+    activities were found in the old course data that could not be matched
+    to the new syllabus.
+    It returns nothing.
+    """
+    
+    global undefined_activities
+    
+    if len(undefined_activities) > 0:
+        undefined_activities.sort()
+        
+        msg_undef_act = """
+        Found _{}_ learning activities in the old course data that were not
+        defined in the syllabus.
+        These were included in the new Common Cartridge file without modification:"""
+        gui_progress_update(msg_undef_act.format(len(undefined_activities)))
+      
+        for unmatched_activity in undefined_activities:
+            msg_undef_list = "\t" + unmatched_activity
+            gui_progress_update(msg_undef_list,
+                                leading_lbs = 1,
+                                
+                                cleanup = False)
+    
+    return
+
+
+def syllabus_datetime(date_cell, time_cell):
+    """
+    This function accepts the date & time cells for one of an activity's
+    available, due, or lock times, as read from the syllabus.
+    It returns the combined date/time as an interned, LMS-formatted UTC
+    string (see format_datetime), or an empty string if no date is given.
+    It raises a ValueError if either cell cannot be read as a date or time.
+    """
+    
+    if not date_cell:
+        return ""
+    
+    if not isinstance(date_cell, datetime.date):
+        raise ValueError("{!r} is not a date".format(date_cell))
+    
+    # For reasons yet to be determined, openpyxl sometimes reads a time as a
+    # datetime object; other times as a time object. datetime.datetime.combine
+    # requires a time object, so convert it if it is read as a datetime object.
+    if isinstance(time_cell, datetime.datetime):
+        time_cell = time_cell.time()
+    elif not isinstance(time_cell, datetime.time):
+        raise ValueError("{!r} is not a time".format(time_cell))
+    
+    # Many activities share the same dates & times, so intern the string.
+    return sys.intern(
+        format_datetime(datetime.datetime.combine(date_cell, time_cell)))
+
+
 def update_file_meta(abs_path_to_file):
     """
     This function accepts the absolute path to a file that has already been
@@ -253,7 +407,12 @@ def update_file_meta(abs_path_to_file):
     global course_metadata, undefined_activities
     
     # Open the XML file and instantiate Beautiful Soup parsing.
-    xml_file = open(abs_path_to_file, mode = "rt+", encoding = "utf-8")
+    # Line endings are not translated to the operating system's own. The
+    # updated XML is always written with "\n" line endings (the XML parser
+    # normalizes the body to "\n"), so the rewritten file is the same
+    # byte-for-byte no matter which operating system runs this script.
+    xml_file = open(abs_path_to_file, mode = "rt+", encoding = "utf-8",
+                    newline = "")
     
     # Snag the first line, which contains the good-practice XML declaration.
     # Beautiful Soup erases it.
@@ -275,33 +434,18 @@ def update_file_meta(abs_path_to_file):
     
     # If an modified title is specified, update it. Otherwise keep the previous
     # title.
-    if new_metadata["new_title"]:
-        soup.title.string = new_metadata["new_title"]
+    if new_metadata.new_title:
+        soup.title.string = new_metadata.new_title
     else:
         pass
     
     # If new available, due, or lock times are specified, update them.
     # If not, delete the times that were copied over from the previous
-    # semester.
-    if new_metadata["new_avail_datetime"]:
-        unlock_at_str = format_datetime(new_metadata["new_avail_datetime"])
-    else:
-        unlock_at_str = ""
-        
-    if new_metadata["new_due_datetime"]:
-        due_at_str = format_datetime(new_metadata["new_due_datetime"])
-    else:
-        due_at_str = ""
-
-    if new_metadata["new_lock_datetime"]:
-        lock_at_str = format_datetime(new_metadata["new_lock_datetime"])
-    else:
-        lock_at_str = ""
-    
+    # semester. (Unspecified times are stored as empty strings.)
     tags_to_update = {
-                        "unlock_at" : unlock_at_str,
-                        "due_at" : due_at_str,
-                        "lock_at" : lock_at_str,
+                        "unlock_at" : new_metadata.unlock_at,
+                        "due_at" : new_metadata.due_at,
+                        "lock_at" : new_metadata.lock_at,
                         "all_day_date" : ""
                      }
     
@@ -327,8 +471,8 @@ def update_file_meta(abs_path_to_file):
     # a "tag" object containing updated XML code. Need to convert it to string.
     xml_file.truncate(0)
     xml_file.seek(0)
-    # Give the XML declaration back.
-    xml_file.write(xml_declaration)
+    # Give the XML declaration back, with the same line ending as the body.
+    xml_file.write(xml_declaration.rstrip("\r\n") + "\n")
     xml_file.write(str(soup.contents[0]))
     xml_file.close()
     
@@ -346,81 +490,393 @@ def update_manager():
     
     global course_metadata, undefined_activities
     
-    # Unpack the contents of the previous semester's exported course cartridge.
-    extract_prev_course()
+    # Whether the update succeeds or fails, tidy up afterwards.
+    try:
+        # Unpack the contents of the previous semester's exported course
+        # cartridge.
+        extract_prev_course()
+    
+        # Call the find_activities() function to copy the previous semester's
+        # course data and generate a list of subdirectories (absolute paths)
+        # that contain learning activities.
+        activity_subdirs = find_activities()
+
+        # Call the extract_metadata() function to read new syllabus
+        # information from the new syllabus Excel file into the
+        # course_metadata dictionary.
+        course_metadata = extract_metadata()
+
+        # Use counters to track how many activities have been processed.
+        # The undefined_activities list will capture any old learning
+        # activities that cannot be exactly matched in new_syllabus.xlsx.
+        modified_counts = 0
+        undefined_activities = []
+
+        # Update the progress window with the status. 
+        msg_update_meta = "Updating the new course according to the syllabus."
+        gui_progress_update(msg_update_meta)
+    
+        # Iterate over all the subdirectories containing learning activities.
+        for subdir in activity_subdirs:
+    
+            # Check for metadata XML files. If present, call the
+            # update_file_meta() function to replace titles, due dates, etc.,
+            # with the user specifications.
+            for meta_file in ACTIVITY_META_FILES:
+                if meta_file in os.listdir(subdir):
+                    update_file_meta(subdir + "/" + meta_file)
+                    modified_counts += 1
+                else:
+                    pass
+        
+        # Compress the new_course folder into a .imscc (standard zip) file
+        # ready to be uploaded to the LMS.
+        compress_new_course()
     
-    # Call the find_activities() function to copy the previous semester's course
-    # data and generate a list of subdirectories (absolute paths) that contain
-    # learning activities.
-    activity_subdirs = find_activities()
+    finally:
+        # For the sake of good housekeeping, delete the two directories we
+        # made, along with any half-written new course file.
+        remove_scratch_files()
 
-    # Call the extract_metadata() function to read new syllabus information from
-    # the new syllabus Excel file into the course_metadata dictionary.
-    course_metadata = extract_metadata()
+    # Print a message alerting the user if any learning activities were found
+    # that could not be matched to the new syllabus.
+    report_undefined_activities()
 
-    # Use counters to track how many activities have been processed.
-    # The undefined_activities list will capture any old learning activities
-    # that cannot be exactly matched in new_syllabus.xlsx.
-    modified_counts = 0
-    undefined_activities = []
 
-    # Update the progress window with the status. 
-    msg_update_meta = "Updating the new course according to the syllabus."
-    gui_progress_update(msg_update_meta)
-    
-    # Iterate over all the subdirectories containing learning activities.
-    for subdir in activity_subdirs:
-    
-        # Check for metadata XML files. If present, call the update_file_meta()
-        # function to replace titles, due dates, etc., with the user
-        # specifications.
-        meta_file_list = ["assignment_settings.xml", "assessment_meta.xml"]
-        for meta_file in meta_file_list:
-            if meta_file in os.listdir(subdir):
-                update_file_meta(subdir + "/" + meta_file)
-                modified_counts += 1
-            else:
-                pass
+
+# ==== BEGIN DEFINING BATCH-RELATED FUNCTIONS ====
+# The functions in this section migrate many courses in one run, without the
+# GUI. Each finished job is recorded in an append-only journal so that an
+# interrupted run can be resumed.
+
+def hash_file(abs_path_to_file):
+    """
+    This function accepts the path to a file.
+    It returns the SHA-256 hex digest of the file's contents.
+    """
+
+    file_hash = hashlib.sha256()
+    with open(abs_path_to_file, mode = "rb") as file_to_hash:
+        for chunk in iter(lambda: file_to_hash.read(1024 * 1024), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+def journal_load(filepath_journal):
+    """
+    This function accepts the path to a batch completion journal.
+    It returns a dictionary of the jobs recorded in the journal, keyed by
+    destination path. If a destination was completed more than once, the
+    most recent entry wins.
+    A line left incomplete by an interruption is ignored.
+    """
+
+    completed_jobs = {}
+
+    if not os.path.exists(filepath_journal):
+        return completed_jobs
+
+    with open(filepath_journal, mode = "rt", encoding = "utf-8") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            completed_jobs[entry["new_course"]] = entry
+
+    return completed_jobs
+
+
+def journal_append(filepath_journal, entry):
+    """
+    This function accepts the path to a batch completion journal and a
+    dictionary describing one completed job.
+    It appends the entry to the journal as a single line of JSON and flushes
+    it to disk before returning.
+    """
+
+    # If an interruption left the last line incomplete, end it first, so
+    # that this entry starts on a line of its own and is not lost with it.
+    needs_newline = False
+    if os.path.exists(filepath_journal) and os.path.getsize(filepath_journal):
+        with open(filepath_journal, mode = "rb") as journal:
+            journal.seek(-1, os.SEEK_END)
+            needs_newline = journal.read(1) != b"\n"
+
+    with open(filepath_journal, mode = "at", encoding = "utf-8") as journal:
+        if needs_newline:
+            journal.write("\n")
+        journal.write(json.dumps(entry, sort_keys = True) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    return
+
+
+def batch_manager(filepath_jobs, filepath_journal, resume):
+    """
+    This function runs a batch of course migrations without the GUI.
+    It accepts the path to a CSV file of jobs, with the column headers
+    prior_course, syllabus, and new_course; the path to the completion
+    journal; and whether to resume (a boolean).
+    When resuming, jobs whose inputs are unchanged and whose output still
+    matches the journal are skipped. Everything else is run again.
+    """
+
+    global filepath_old, filepath_new, filepath_syl, filepath_root
+
+    # "utf-8-sig" skips the byte order mark that Excel adds to the start of
+    # files saved as "CSV UTF-8"; it would otherwise garble the first header.
+    with open(filepath_jobs, mode = "rt", encoding = "utf-8-sig",
+              newline = "") as jobs_file:
+        jobs_reader = csv.DictReader(jobs_file)
         
-    # Compress the new_course folder into a .imscc (standard zip) file ready
-    # to be uploaded to the LMS.
-    compress_new_course()
+        # Stop straight away if a column is missing, rather than failing
+        # every job in the file one at a time.
+        missing_columns = [column for column in BATCH_JOB_COLUMNS
+                           if column not in (jobs_reader.fieldnames or [])]
+        if missing_columns:
+            msg_bad_jobs = """
+            The batch file {} is missing the column(s): {}.
+            Its first row must be the column headers prior_course, syllabus,
+            and new_course.""".format(filepath_jobs, ", ".join(missing_columns))
+            gui_progress_update(msg_bad_jobs)
+            exit(1)
+        
+        jobs = list(jobs_reader)
 
-    # For the sake of good housekeeping, delete the two directories we made.
-    rmtree(filepath_root + "old_course", ignore_errors = True)
-    rmtree(filepath_root + "new_course", ignore_errors = True)
+    if resume:
+        completed_jobs = journal_load(filepath_journal)
+    else:
+        completed_jobs = {}
 
-    # Print a message alerting the user if any learning activities were found
-    # that could not be matched to the new syllabus.
-    if len(undefined_activities) > 0:
-        undefined_activities.sort()
+    skipped_counts, done_counts, failed_jobs = 0, 0, []
+
+    for job_number, job in enumerate(jobs, start = 1):
+        filepath_old = job.get("prior_course")
+        filepath_syl = job.get("syllabus")
+        filepath_new = job.get("new_course")
+
+        # A short or incomplete row leaves some of the paths empty.
+        if not filepath_old or not filepath_syl or not filepath_new:
+            msg_bad_row = """
+            Job {} of {}: failed. The row must list a prior_course, syllabus,
+            and new_course.""".format(job_number, len(jobs))
+            gui_progress_update(msg_bad_row)
+            failed_jobs.append("Job {} ({})".format(job_number,
+                               filepath_new or "no new_course given"))
+            continue
+
+        filepath_root = filepath_old[:filepath_old.rfind("/")+1]
+
+        msg_job = "Job {} of {}: {}".format(job_number, len(jobs), filepath_new)
+        gui_progress_update(msg_job)
+
+        try:
+            prior_course_hash = hash_file(filepath_old)
+            syllabus_hash = hash_file(filepath_syl)
+        except OSError as err:
+            msg_missing = "Job failed: {}".format(err)
+            gui_progress_update(msg_missing, leading_lbs = 1)
+            failed_jobs.append(filepath_new)
+            continue
+
+        # Skip this job only if it finished against the same inputs, and the
+        # output on disk is exactly the one that was recorded.
+        prev_entry = completed_jobs.get(filepath_new)
+        if (
+            prev_entry
+            and prev_entry["prior_course_sha256"] == prior_course_hash
+            and prev_entry["syllabus_sha256"] == syllabus_hash
+            and os.path.exists(filepath_new)
+            and hash_file(filepath_new) == prev_entry["new_course_sha256"]
+           ):
+            gui_progress_update("Already complete. Skipping.", leading_lbs = 1)
+            skipped_counts += 1
+            continue
+
+        try:
+            update_manager()
+        except Exception as err:
+            # Leave the job out of the journal so that it is run again when
+            # the batch is resumed.
+            msg_failed = "Job failed: {}".format(err)
+            gui_progress_update(msg_failed, leading_lbs = 1)
+            failed_jobs.append(filepath_new)
+            continue
+
+        journal_append(filepath_journal,
+                       {"prior_course" : filepath_old,
+                        "prior_course_sha256" : prior_course_hash,
+                        "syllabus" : filepath_syl,
+                        "syllabus_sha256" : syllabus_hash,
+                        "new_course" : filepath_new,
+                        "new_course_sha256" : hash_file(filepath_new)})
+        done_counts += 1
+
+    msg_batch = """
+    Batch complete: _{}_ migrated, _{}_ skipped, _{}_ failed.""".format(
+        done_counts, skipped_counts, len(failed_jobs))
+    gui_progress_update(msg_batch)
+
+    for failed_job in failed_jobs:
+        gui_progress_update("\t" + failed_job, leading_lbs = 1, cleanup = False)
+
+    return
+
+
+
+# ==== BEGIN DEFINING WATCH-RELATED FUNCTIONS ====
+# The functions in this section rebuild the new course each time the syllabus
+# is saved. The prior course is unpacked only once; after that, only the
+# activities whose syllabus rows changed are rewritten.
+
+def syllabus_stamp():
+    """
+    This function returns the modification time & size of the syllabus
+    file, which change whenever it is saved. If the file is briefly missing
+    (some editors save by replacing it), it returns None.
+    """
+    
+    global filepath_syl
+    
+    try:
+        syllabus_stat = os.stat(filepath_syl)
+    except FileNotFoundError:
+        return None
+    
+    return (syllabus_stat.st_mtime_ns, syllabus_stat.st_size)
+
+
+def watch_manager(poll_interval = 0.1, settle_time = 0.25):
+    """
+    This function migrates the course once, then keeps watching the syllabus
+    and rebuilds the new course each time it is saved. It runs until the
+    user presses Ctrl+C.
+    It accepts how often to check the syllabus for changes and how long a
+    change must go unmodified before rebuilding (both in seconds), so that
+    a burst of saves results in a single rebuild.
+    """
+    
+    global course_metadata
+    
+    try:
+        # Unpack & copy the prior course just once. It stays on disk, and the
+        # original XML of every activity stays in memory, between rebuilds.
+        extract_prev_course()
+        activity_subdirs = find_activities()
         
-        msg_undef_act = """
-        Found _{}_ learning activities in the old course data that were not
-        defined in the syllabus.
-        These were included in the new Common Cartridge file without modification:"""
-        gui_progress_update(msg_undef_act.format(len(undefined_activities)))
-      
-        for unmatched_activity in undefined_activities:
-            msg_undef_list = "\t" + unmatched_activity
-            gui_progress_update(msg_undef_list,
-                                leading_lbs = 1,
-                                
-                                cleanup = False)
+        # activity_files = {abs_path_to_file : (prev_title, original_xml)}
+        activity_files = {}
+        for subdir in activity_subdirs:
+            for meta_file in ACTIVITY_META_FILES:
+                if meta_file in os.listdir(subdir):
+                    abs_path_to_file = subdir + "/" + meta_file
+                    with open(abs_path_to_file, mode = "rt",
+                              encoding = "utf-8", newline = "") as xml_file:
+                        original_xml = xml_file.read()
+                    prev_title = BeautifulSoup(original_xml, "xml").title.string
+                    activity_files[abs_path_to_file] = (prev_title,
+                                                        original_xml)
+        
+        # The syllabus metadata most recently written to each activity file.
+        applied_meta = {}
+        last_stamp = None
+        
+        msg_watch = """
+        Watching the syllabus for changes. The new course will be rebuilt
+        each time it is saved. Press Ctrl+C to stop."""
+        gui_progress_update(msg_watch)
+        
+        while True:
+            stamp = syllabus_stamp()
+            if stamp is None or stamp == last_stamp:
+                time.sleep(poll_interval)
+                continue
+            
+            # Wait for the save to settle before reading the syllabus.
+            time.sleep(settle_time)
+            if syllabus_stamp() != stamp:
+                continue
+            last_stamp = stamp
+            rebuild_start = time.monotonic()
+            
+            try:
+                course_metadata = extract_metadata()
+            except Exception as err:
+                # A half-saved or malformed syllabus. Keep the previous
+                # output and try again on the next save.
+                msg_bad_syl = "Could not read the syllabus: {}".format(err)
+                gui_progress_update(msg_bad_syl, leading_lbs = 1)
+                continue
+            
+            try:
+                rebuilt_counts = watch_rebuild(activity_files, applied_meta)
+            except Exception as err:
+                # For example, the new course file is locked or the disk is
+                # full. Keep the previous output and try again on the next
+                # save. Activities that were not updated will be retried.
+                msg_failed = "Could not rebuild the new course: {}".format(err)
+                gui_progress_update(msg_failed, leading_lbs = 1)
+                continue
+            
+            msg_rebuilt = "Updated _{}_ activities in {:.2f} seconds.".format(
+                rebuilt_counts, time.monotonic() - rebuild_start)
+            gui_progress_update(msg_rebuilt)
+    
+    except KeyboardInterrupt:
+        pass
+    
+    finally:
+        # For the sake of good housekeeping, delete the two directories we
+        # made, along with any half-written new course file.
+        remove_scratch_files()
+    
+    return
+
 
-    # Update the progress window to indicate that everything is done.
-    msg_complete = """
-    Migration complete. Your updated course was saved at the file location
-    shown in the main window.
+def watch_rebuild(activity_files, applied_meta):
+    """
+    This function is called by watch_manager() after the syllabus has been
+    read into course_metadata.
+    It accepts the dictionary of activity files & their original XML, and
+    the dictionary of metadata most recently written to each file, which it
+    updates. Only activities whose metadata changed are rewritten. The new
+    course file is then rebuilt.
+    It returns the number of activities that were rewritten.
+    """
     
-    It is ready to be uploaded to your LMS.
+    global course_metadata, undefined_activities
     
-    Be sure to review the status messages above for any potential errors.
+    undefined_activities = []
+    rebuilt_counts = 0
     
-    You may now close the program.
+    for abs_path_to_file, (prev_title, original_xml) in activity_files.items():
+        new_meta = course_metadata.get(prev_title)
+        
+        # Leave activities alone if their syllabus rows are unchanged.
+        if (abs_path_to_file in applied_meta
+            and applied_meta[abs_path_to_file] == new_meta):
+            if new_meta is None:
+                undefined_activities.append(prev_title)
+            continue
+        
+        # Restore the prior term's XML, then apply the new metadata.
+        # Forget what was applied until the update succeeds, so that a
+        # failure part of the way through is retried on the next save.
+        applied_meta.pop(abs_path_to_file, None)
+        with open(abs_path_to_file, mode = "wt", encoding = "utf-8",
+                  newline = "") as xml_file:
+            xml_file.write(original_xml)
+        update_file_meta(abs_path_to_file)
+        applied_meta[abs_path_to_file] = new_meta
+        rebuilt_counts += 1
     
-    Thanks for using LMS Migrator. Have a nice life."""
-    gui_progress_update(msg_complete)
+    compress_new_course()
+    report_undefined_activities()
+    
+    return rebuilt_counts
 
 
 
@@ -584,6 +1040,20 @@ def gui_check_ready():
         gui_progress_update(msg_start)
         
         update_manager()
+        
+        # Update the progress window to indicate that everything is done.
+        msg_complete = """
+        Migration complete. Your updated course was saved at the file location
+        shown in the main window.
+        
+        It is ready to be uploaded to your LMS.
+        
+        Be sure to review the status messages above for any potential errors.
+        
+        You may now close the program.
+        
+        Thanks for using LMS Migrator. Have a nice life."""
+        gui_progress_update(msg_complete)
     
     return
 
@@ -697,6 +1167,14 @@ def gui_progress_update(message, leading_lbs = 2, cleanup = True):
     """
     
     global progress_msgs, progress_win
+    
+    # During a command line batch run there is no progress window. Print the
+    # message to the terminal instead.
+    if progress_win is None:
+        print("\n" * (leading_lbs - 1), end = "")
+        print(cleandoc(message) if cleanup else message, flush = True)
+        return
+    
     # Toggle the progress window to writable, print the message, and toggle
     # back to read-only.
     progress_msgs.configure(state = "normal")
@@ -739,6 +1217,41 @@ def gui_warn(warning):
 # The following code is executed immediately upon calling lms_migrator.py
 
 filepath_old, filepath_new, filepath_syl = None, None, None
-
-root_window = gui_build_layout()
-root_window.mainloop()
+progress_msgs, progress_win = None, None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "LMS Migrator " + version)
+    parser.add_argument("--batch", metavar = "JOBS.csv",
+                        help = """migrate every course listed in a CSV file with
+                        the columns prior_course, syllabus, and new_course,
+                        without opening the GUI""")
+    parser.add_argument("--journal", metavar = "JOURNAL",
+                        help = """where to record completed batch jobs
+                        (default: JOBS.csv.journal)""")
+    parser.add_argument("--resume", action = "store_true",
+                        help = """skip batch jobs that the journal shows are
+                        already complete""")
+    parser.add_argument("--watch", nargs = 3,
+                        metavar = ("PRIOR_COURSE", "SYLLABUS", "NEW_COURSE"),
+                        help = """migrate one course without opening the GUI,
+                        then rebuild it each time the syllabus is saved""")
+    parser.add_argument("--poll-interval", metavar = "SECONDS", type = float,
+                        default = 0.1,
+                        help = """how often watch mode checks the syllabus for
+                        changes (default: 0.1)""")
+    parser.add_argument("--settle-time", metavar = "SECONDS", type = float,
+                        default = 0.25,
+                        help = """how long a saved syllabus must go unchanged
+                        before watch mode rebuilds (default: 0.25)""")
+    args = parser.parse_args()
+
+    if args.batch:
+        batch_manager(args.batch, args.journal or args.batch + ".journal",
+                      args.resume)
+    elif args.watch:
+        filepath_old, filepath_syl, filepath_new = args.watch
+        filepath_root = filepath_old[:filepath_old.rfind("/")+1]
+        watch_manager(args.poll_interval, args.settle_time)
+    else:
+        root_window = gui_build_layout()
+        root_window.mainloop()